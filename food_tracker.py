@@ -1,74 +1,383 @@
 from __future__ import annotations
 
+import atexit
 import csv
+import functools
+import gzip
+import hashlib
 import io
+import itertools
 import os
 import threading
 import time
-from datetime import date, datetime, timedelta
-from typing import Any
+import zlib
+from datetime import date, timedelta
+from typing import Any, ContextManager, Iterable, Iterator
 
+import click
+import msgspec
+import orjson
 import psycopg
-from psycopg import OperationalError
+from psycopg import sql
 from psycopg.rows import dict_row
-from flask import Flask, Response, jsonify, render_template_string, request
+from psycopg_pool import ConnectionPool
+from flask import Flask, Response, g, jsonify, request, stream_with_context
+from flask.json.provider import JSONProvider
+
+
+class ORJSONProvider(JSONProvider):
+    """
+    JSON via orjson: a C encoder that writes bytes directly, noticeably
+    faster than the stdlib encoder for lists of row dicts.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
+    def response(self, *args: Any, **kwargs: Any) -> Response:
+        # Skip the bytes -> str -> bytes round trip that dumps() would cost
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(orjson.dumps(obj), mimetype="application/json")
+
+
+# Largest request body read at all (a full bulk import fits with room to spare).
+# Werkzeug stops reading there, chunked bodies included.
+MAX_BODY_BYTES = 8 * 1024 * 1024
 
 app = Flask(__name__)
+app.json = ORJSONProvider(app)
+app.config["MAX_CONTENT_LENGTH"] = MAX_BODY_BYTES
 
 # -------------------- DB helpers --------------------
 
 _DB_READY = False
 _DB_LOCK = threading.Lock()
 
+_POOL: ConnectionPool | None = None
+_POOL_LOCK = threading.Lock()
 
-def db() -> psycopg.Connection:
+
+def pool() -> ConnectionPool:
     """
-    Create a short-lived DB connection with timeout + retries.
-    This prevents requests from hanging (Cloudflare 524) and reduces 502/503.
+    Process-wide connection pool, created on first use.
+    Reusing connections skips the TCP+TLS+auth handshake on every request;
+    the pool reconnects in the background if the DB restarts or sleeps.
     """
-    url = os.environ.get("DATABASE_URL")
-    if not url:
-        raise RuntimeError("DATABASE_URL is not set (Render env var missing).")
+    global _POOL
+    if _POOL is not None:
+        return _POOL
+
+    with _POOL_LOCK:
+        if _POOL is not None:
+            return _POOL
+
+        url = os.environ.get("DATABASE_URL")
+        if not url:
+            raise RuntimeError("DATABASE_URL is not set (Render env var missing).")
+
+        _POOL = ConnectionPool(
+            conninfo=url,
+            min_size=2,
+            max_size=10,
+            kwargs={
+                "row_factory": dict_row,
+                # Single statements commit on their own (no BEGIN/COMMIT round-trips);
+                # multi-statement work opts in with conn.transaction().
+                "autocommit": True,
+                "connect_timeout": 4,
+                # statement_timeout makes any query fail fast rather than hang forever
+                "options": "-c statement_timeout=8000",
+            },
+            # drop connections the server closed while idle (e.g. DB woke up again)
+            check=ConnectionPool.check_connection,
+            name="food_tracker",
+            open=True,
+        )
+        atexit.register(_POOL.close)
+        return _POOL
 
-    last_err: Exception | None = None
 
-    # Keep overall wait small so Cloudflare doesn't time out
-    for attempt in range(1, 7):  # ~ (connect_timeout + sleep) * 6 ~= under ~30s worst-case
-        try:
-            # statement_timeout makes any query fail fast rather than hang forever
-            return psycopg.connect(
-                url,
-                row_factory=dict_row,
-                connect_timeout=4,
-                options="-c statement_timeout=8000",
-            )
-        except OperationalError as e:
-            last_err = e
-            # small backoff
-            time.sleep(min(1.5 * attempt, 6))
+def db() -> ContextManager[psycopg.Connection]:
+    """
+    Borrow a pooled (autocommit) connection; it goes back to the pool on exit.
+    The wait is kept short so Cloudflare doesn't time out (524).
+    """
+    return pool().connection(timeout=20)
 
-    raise last_err or RuntimeError("DB connection failed (unknown error)")
 
+def get_conn() -> psycopg.Connection:
+    """
+    The current request's connection, borrowed from the pool on first use and
+    shared by everything the request runs; release_conn() hands it back.
+    """
+    if "conn" not in g:
+        g.conn = pool().getconn(timeout=20)
+    return g.conn
 
-def init_db() -> None:
+
+@app.teardown_request
+def release_conn(exc: BaseException | None) -> None:
+    conn = g.pop("conn", None)
+    if conn is not None:
+        pool().putconn(conn)
+
+
+# Bump whenever migrate() changes; databases already at this version skip it.
+SCHEMA_VERSION = 7
+# pg_advisory_xact_lock key that serializes migrations across workers/instances
+MIGRATION_LOCK_KEY = 0x666F6F64
+
+
+def schema_version(conn: psycopg.Connection) -> int:
+    if conn.execute("SELECT to_regclass('schema_version') AS t").fetchone()["t"] is None:
+        return 0
+    row = conn.execute("SELECT version FROM schema_version").fetchone()
+    return int(row["version"]) if row else 0
+
+
+def migrate(conn: psycopg.Connection) -> None:
     """
     Create tables/indexes. Safe to run multiple times.
     """
-    with db() as conn:
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entries (
+          id SERIAL PRIMARY KEY,
+          day DATE NOT NULL,              -- client-local calendar day
+          meal TEXT NOT NULL,
+          ts BIGINT NOT NULL,             -- unix ms
+          note TEXT NOT NULL DEFAULT '',
+          calories INTEGER NOT NULL DEFAULT 0
+        );
+        """
+    )
+    # Old workers keep writing while a release migrates. Hold their writes
+    # (reads go on) until commit, so no row lands between the recounts below
+    # and the triggers that take over from them.
+    conn.execute("LOCK TABLE entries IN SHARE ROW EXCLUSIVE MODE;")
+    # Older deployments stored day as TEXT. DATE is 4 bytes instead of ~11 and
+    # compares as an integer, which shrinks rows and idx_entries_day.
+    col = conn.execute(
+        """
+        SELECT data_type FROM information_schema.columns
+        WHERE table_schema = current_schema() AND table_name = 'entries' AND column_name = 'day'
+        """
+    ).fetchone()
+    if col and col["data_type"] != "date":
+        # add_entry used to store any non-empty string, and one value that does
+        # not cast would abort the ALTER with an opaque error. Name them instead.
         conn.execute(
             """
-            CREATE TABLE IF NOT EXISTS entries (
-              id SERIAL PRIMARY KEY,
-              day TEXT NOT NULL,              -- YYYY-MM-DD
-              meal TEXT NOT NULL,
-              ts BIGINT NOT NULL,             -- unix ms
-              note TEXT NOT NULL DEFAULT '',
-              calories INTEGER NOT NULL DEFAULT 0
-            );
+            CREATE OR REPLACE FUNCTION pg_temp.is_date(t TEXT) RETURNS BOOLEAN
+            LANGUAGE plpgsql AS $$
+            BEGIN
+              PERFORM t::date;
+              RETURN true;
+            EXCEPTION WHEN others THEN
+              RETURN false;
+            END $$;
             """
         )
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_day ON entries(day);")
-        conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_ts ON entries(ts);")
+        bad = conn.execute(
+            "SELECT id, day FROM entries WHERE NOT pg_temp.is_date(day) ORDER BY id"
+        ).fetchall()
+        if bad:
+            listed = ", ".join(f"{r['id']} ({r['day']!r})" for r in bad[:20])
+            more = f" and {len(bad) - 20} more" if len(bad) > 20 else ""
+            raise RuntimeError(
+                f"Cannot convert entries.day to DATE: {len(bad)} row(s) hold no valid date: "
+                f"{listed}{more}. Fix or delete them, then run init-db again."
+            )
+        conn.execute("ALTER TABLE entries ALTER COLUMN day TYPE DATE USING day::date;")
+    # (day, ts) serves the per-day log already in ts order, day-range sums and
+    # clear-day deletes (day is its prefix), and the export's ORDER BY day, ts.
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_day_ts ON entries(day, ts);")
+    conn.execute("DROP INDEX IF EXISTS idx_entries_day;")
+    conn.execute("CREATE INDEX IF NOT EXISTS idx_entries_ts ON entries(ts);")
+
+    # 96-row running histogram (UTC quarter-hours) kept up to date by a trigger
+    # on entries, so the chart never has to scan entries. Quarter-hours, not
+    # hours, so that every real zone offset (+5:30, +5:45, -3:30) rotates them
+    # exactly. Recounted from the rows on every migration, which also repairs
+    # drift from writes made before the trigger existed. It replaces the
+    # 24-bucket entries_hour_hist.
+    conn.execute("DROP TRIGGER IF EXISTS entries_hour_hist ON entries;")
+    conn.execute("DROP FUNCTION IF EXISTS entries_hour_hist();")
+    conn.execute("DROP TABLE IF EXISTS entries_hour_hist;")
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS entries_slot_hist (
+          slot SMALLINT PRIMARY KEY,      -- 0..95, quarter-hour of the UTC day
+          n BIGINT NOT NULL DEFAULT 0
+        );
+        """
+    )
+    conn.execute(
+        f"""
+        INSERT INTO entries_slot_hist(slot, n)
+        SELECT q, COUNT(e.id)
+        FROM generate_series(0, 95) AS q
+        LEFT JOIN entries e ON {SLOT_OF_TS.format("e.ts")} = q
+        GROUP BY q
+        ON CONFLICT (slot) DO UPDATE SET n = EXCLUDED.n;
+        """
+    )
+    conn.execute(
+        f"""
+        CREATE OR REPLACE FUNCTION entries_slot_hist() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+          IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE entries_slot_hist SET n = n - 1 WHERE slot = {SLOT_OF_TS.format("OLD.ts")};
+          END IF;
+          IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            UPDATE entries_slot_hist SET n = n + 1 WHERE slot = {SLOT_OF_TS.format("NEW.ts")};
+          END IF;
+          RETURN NULL;
+        END $$;
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TRIGGER entries_slot_hist
+        AFTER INSERT OR DELETE OR UPDATE OF ts ON entries
+        FOR EACH ROW EXECUTE FUNCTION entries_slot_hist();
+        """
+    )
+
+    # Per-day calorie totals kept by a trigger on entries, so the summary sums
+    # one row per day instead of every entry. n counts the day's entries;
+    # rows emptied by deletes stay behind with n = 0. Recounted on every
+    # migration like the histogram, which repairs any drift.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS daily_totals (
+          day DATE PRIMARY KEY,
+          total BIGINT NOT NULL DEFAULT 0,
+          n INTEGER NOT NULL DEFAULT 0
+        );
+        """
+    )
+    conn.execute(
+        """
+        INSERT INTO daily_totals(day, total, n)
+        SELECT day, SUM(calories), COUNT(*) FROM entries GROUP BY day
+        ON CONFLICT (day) DO UPDATE SET total = EXCLUDED.total, n = EXCLUDED.n;
+        """
+    )
+    conn.execute(
+        """
+        UPDATE daily_totals d SET total = 0, n = 0
+        WHERE n <> 0 AND NOT EXISTS (SELECT 1 FROM entries e WHERE e.day = d.day);
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE FUNCTION entries_daily_totals() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+          IF TG_OP IN ('UPDATE', 'DELETE') THEN
+            UPDATE daily_totals SET total = total - OLD.calories, n = n - 1
+            WHERE day = OLD.day;
+          END IF;
+          IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            INSERT INTO daily_totals(day, total, n) VALUES (NEW.day, NEW.calories, 1)
+            ON CONFLICT (day) DO UPDATE
+            SET total = daily_totals.total + EXCLUDED.total, n = daily_totals.n + 1;
+          END IF;
+          RETURN NULL;
+        END $$;
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TRIGGER entries_daily_totals
+        AFTER INSERT OR DELETE OR UPDATE OF day, calories ON entries
+        FOR EACH ROW EXECUTE FUNCTION entries_daily_totals();
+        """
+    )
+    # TRUNCATE fires no row triggers, so it empties both counter tables itself.
+    conn.execute(
+        """
+        CREATE OR REPLACE FUNCTION reset_entry_counters() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+          UPDATE entries_slot_hist SET n = 0;
+          DELETE FROM daily_totals;
+          RETURN NULL;
+        END $$;
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TRIGGER entries_counters_truncate
+        AFTER TRUNCATE ON entries
+        FOR EACH STATEMENT EXECUTE FUNCTION reset_entry_counters();
+        """
+    )
+
+    # Single-row counter bumped by every statement that changes entries. Read
+    # views use it as their ETag, so an unchanged dataset gets a 304 without
+    # computing anything, in every worker alike.
+    conn.execute(
+        """
+        CREATE TABLE IF NOT EXISTS data_version (
+          id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+          v BIGINT NOT NULL DEFAULT 0
+        );
+        """
+    )
+    conn.execute("INSERT INTO data_version(id) VALUES (TRUE) ON CONFLICT (id) DO NOTHING;")
+    conn.execute(
+        """
+        CREATE OR REPLACE FUNCTION bump_data_version() RETURNS trigger
+        LANGUAGE plpgsql AS $$
+        BEGIN
+          UPDATE data_version SET v = v + 1;
+          RETURN NULL;
+        END $$;
+        """
+    )
+    conn.execute(
+        """
+        CREATE OR REPLACE TRIGGER entries_data_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON entries
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_data_version();
+        """
+    )
+
+
+def init_db() -> None:
+    """
+    Bring the schema up to SCHEMA_VERSION. When it already is, this is one lookup
+    and no DDL; otherwise one worker migrates under an advisory lock while any
+    others starting at the same time wait for it, then see the new version.
+    """
+    with db() as conn:
+        if schema_version(conn) >= SCHEMA_VERSION:
+            return
+        with conn.transaction():
+            conn.execute("SELECT pg_advisory_xact_lock(%s)", (MIGRATION_LOCK_KEY,))
+            if schema_version(conn) >= SCHEMA_VERSION:
+                return
+            migrate(conn)
+            conn.execute("CREATE TABLE IF NOT EXISTS schema_version (version INTEGER NOT NULL)")
+            conn.execute("DELETE FROM schema_version")
+            conn.execute("INSERT INTO schema_version(version) VALUES (%s)", (SCHEMA_VERSION,))
+
+        # Fresh planner statistics for what the migration just built or refilled;
+        # autovacuum gets there too, but not necessarily before the first requests
+        conn.execute("ANALYZE entries, daily_totals, entries_slot_hist")
+
+
+@app.cli.command("init-db")
+def init_db_command() -> None:
+    """Create or migrate the database schema (run once per deploy)."""
+    init_db()
+    click.echo(f"Schema at version {SCHEMA_VERSION}.")
 
 
 def ensure_db_ready() -> None:
@@ -89,52 +398,220 @@ def ensure_db_ready() -> None:
 
 # -------------------- date helpers --------------------
 
+# UTC quarter-hour of the day (0..95) of a unix-ms column or parameter: integer
+# math only, no timestamp conversion, and no dependence on the session timezone.
+# Views rotate the 96 slots to the browser's zone (see parse_tz_offset). Postgres
+# / and % truncate toward zero, so the day offset is folded non-negative first:
+# ts before 1970 still lands in 0..95 instead of missing every slot.
+SLOT_OF_TS = "(((({} % 86400000) + 86400000) % 86400000) / 900000)::int"
+
+
 def iso_today() -> str:
     return date.today().isoformat()
 
 
+@functools.lru_cache(maxsize=512)
 def parse_iso_day(day_str: str) -> date:
-    return datetime.strptime(day_str, "%Y-%m-%d").date()
+    # fromisoformat is C and much faster than strptime, but since 3.11 it also
+    # takes forms like "20240101" or "2024-W01-1", so pin the shape first.
+    # Memoized: a session polls the same few days (errors are never cached).
+    if len(day_str) != 10 or day_str[4] != "-" or day_str[7] != "-":
+        raise ValueError(f"Invalid day: {day_str!r}")
+    return date.fromisoformat(day_str)
 
 
+def parse_tz_offset(tz_str: str | None) -> int:
+    """
+    ?tz= as the browser's Date.getTimezoneOffset() reports it (minutes, UTC minus
+    local) -> quarter-hours local time is ahead of UTC. Missing means UTC.
+
+    This is the browser's offset now, applied to every entry: in a zone with DST,
+    meals logged under the other half of the year's offset show an hour off.
+    """
+    if not tz_str:
+        return 0
+    minutes = int(tz_str)
+    if not -1440 < minutes < 1440:
+        raise ValueError(f"Invalid tz: {tz_str!r}")
+    return -round(minutes / 15)
+
+
+# Bounds are half-open, [start, end): end is the first day *after* the range,
+# so filters read `day >= start AND day < end` and stay correct if they ever
+# move to timestamp granularity. Consecutive refreshes ask about the same few
+# days, so they are memoized (dates are immutable, so sharing tuples is safe).
+@functools.lru_cache(maxsize=512)
 def week_bounds(d: date) -> tuple[date, date]:
     start = d - timedelta(days=d.weekday())  # Monday
-    end = start + timedelta(days=6)
-    return start, end
+    return start, start + timedelta(days=7)
 
 
+@functools.lru_cache(maxsize=512)
 def month_bounds(d: date) -> tuple[date, date]:
-    start = d.replace(day=1)
-    if start.month == 12:
-        next_month = date(start.year + 1, 1, 1)
-    else:
-        next_month = date(start.year, start.month + 1, 1)
-    end = next_month - timedelta(days=1)
-    return start, end
+    return d.replace(day=1), date(d.year + (d.month == 12), d.month % 12 + 1, 1)
 
 
-def sum_calories_between(conn: psycopg.Connection, start_day: date, end_day: date) -> int:
+def entries_for_day(conn: psycopg.Connection, d: date) -> list[dict[str, Any]]:
+    return conn.execute(
+        """
+        SELECT id, to_char(day, 'YYYY-MM-DD') AS day, meal, ts, note, calories
+        FROM entries WHERE day=%s ORDER BY ts ASC
+        """,
+        (d,),
+        prepare=True,
+    ).fetchall()
+
+
+def summary_for_day(conn: psycopg.Connection, d: date) -> dict[str, Any]:
+    w0, w1 = week_bounds(d)
+    m0, m1 = month_bounds(d)
+
+    # One statement computes every total in a single pass over daily_totals
+    # (one row per day), not over every entry
     row = conn.execute(
-        "SELECT COALESCE(SUM(calories),0) AS total FROM entries WHERE day BETWEEN %s AND %s",
-        (start_day.isoformat(), end_day.isoformat()),
+        """
+        SELECT
+          COALESCE(SUM(total) FILTER (WHERE day = %s), 0) AS day_total,
+          COALESCE(SUM(total) FILTER (WHERE day >= %s AND day < %s), 0) AS week_total,
+          COALESCE(SUM(total) FILTER (WHERE day >= %s AND day < %s), 0) AS month_total,
+          COALESCE(SUM(total), 0) AS all_total,
+          COUNT(*) FILTER (WHERE n > 0) AS days_with_entries
+        FROM daily_totals
+        """,
+        (d, w0, w1, m0, m1),
+        prepare=True,
     ).fetchone()
-    return int(row["total"] or 0)
+
+    all_total = int(row["all_total"])
+    days_with_entries = int(row["days_with_entries"])
+    avg_daily = round(all_total / days_with_entries) if days_with_entries > 0 else 0
+
+    return {
+        "day": d.isoformat(),
+        "day_total": int(row["day_total"]),
+        "week_total": int(row["week_total"]),
+        "month_total": int(row["month_total"]),
+        "all_total": all_total,
+        "avg_daily": avg_daily,
+        "days_with_entries": days_with_entries,
+    }
+
+
+def data_version(conn: psycopg.Connection) -> int:
+    """Counter that changes whenever entries do (see data_version in migrate())."""
+    return int(conn.execute("SELECT v FROM data_version", prepare=True).fetchone()["v"])
+
+
+def hour_counts(conn: psycopg.Connection, shift: int = 0) -> list[int]:
+    """
+    Meals per hour of day (24 buckets), read from the entries_slot_hist counters:
+    a 96-row lookup no matter how many entries exist. The counters are UTC
+    quarter-hours; shift (quarter-hours ahead of UTC, from parse_tz_offset)
+    rotates them to local time before they are summed into hours.
+    """
+    rows = conn.execute("SELECT slot, n FROM entries_slot_hist", prepare=True).fetchall()
+
+    counts = [0] * 24
+    for r in rows:
+        counts[(r["slot"] + shift) % 96 // 4] += int(r["n"])
+    return counts
+
+
+# Small in-process TTL cache for the read-mostly aggregates (histogram, per-day
+# summary). Keys include the data version, so a write in any worker makes the
+# old entries unreachable; write routes also clear it to free them early.
+_CACHE: dict[tuple[Any, ...], tuple[float, Any]] = {}
+_CACHE_TTL_S = 10.0
+_CACHE_MAX = 256
 
 
-def rows_to_dicts(rows: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    return [dict(r) for r in rows]
+def cache_get(key: tuple[Any, ...]) -> Any:
+    hit = _CACHE.get(key)
+    if hit is None or hit[0] <= time.monotonic():
+        return None
+    return hit[1]
+
+
+def cache_put(key: tuple[Any, ...], value: Any) -> Any:
+    if len(_CACHE) >= _CACHE_MAX:
+        _CACHE.clear()
+    _CACHE[key] = (time.monotonic() + _CACHE_TTL_S, value)
+    return value
+
+
+def invalidate_caches() -> None:
+    _CACHE.clear()
+
+
+def cached_histogram(v: int, shift: int) -> tuple[dict[str, Any], bytes]:
+    """
+    All-time histogram as (payload, JSON body) at data version v, in the zone
+    shift quarter-hours ahead of UTC. The page asks for it on every refresh but
+    it only changes on writes. Only a miss touches the DB, and keying on v means
+    no worker serves one older than v.
+    """
+    cached = cache_get(("histogram", v, shift))
+    if cached is None:
+        counts = hour_counts(get_conn(), shift)
+        # Sparse {"hour": count}: empty hours are left out (the page treats a
+        # missing hour as 0), which keeps young or patchy logs small
+        payload = {
+            "counts": {str(h): n for h, n in enumerate(counts) if n},
+            "total_entries": sum(counts),
+        }
+        cached = cache_put(("histogram", v, shift), (payload, orjson.dumps(payload)))
+    return cached
+
+
+def cached_summary(d: date, v: int) -> dict[str, Any]:
+    """Per-day totals from summary_for_day() at data version v, cached like the histogram."""
+    totals = cache_get(("summary", d, v))
+    if totals is None:
+        totals = summary_for_day(get_conn(), d)
+        cache_put(("summary", d, v), totals)
+    return totals
+
+
+# -------------------- request schemas --------------------
+
+INSERT_ENTRY_SQL = (
+    "INSERT INTO entries(day, meal, ts, note, calories) VALUES(%s,%s,%s,%s,%s) RETURNING id"
+)
+
+
+class EntryIn(msgspec.Struct):
+    """
+    JSON body of POST /api/entries and PUT /api/entries/<id> (and each item
+    of POST /api/entries/bulk), parsed and type-checked in one C pass.
+    Decoded with strict=False so numeric strings for ts/calories still work;
+    a null note is empty and null calories count as 0.
+    """
+
+    day: date
+    meal: str
+    ts: int
+    note: str | None = None
+    calories: int | None = 0
+
+    def row(self) -> tuple[date, str, int, str, int] | None:
+        """
+        Cleaned (day, meal, ts, note, calories) in entries column order, or None
+        when meal is blank. Calories below zero are stored as 0.
+        """
+        meal = self.meal.strip()
+        if not meal:
+            return None
+        return self.day, meal, self.ts, (self.note or "").strip(), max(self.calories or 0, 0)
+
+
+# Built once: the decoders keep their compiled type info across requests
+ENTRY_DECODER = msgspec.json.Decoder(EntryIn, strict=False)
+ENTRIES_DECODER = msgspec.json.Decoder(list[EntryIn], strict=False)
 
 
 # -------------------- UI --------------------
 
-PAGE = r"""
-<!doctype html>
-<html lang="en" data-theme="auto">
-<head>
-  <meta charset="utf-8" />
-  <meta name="viewport" content="width=device-width,initial-scale=1" />
-  <title>Meal Time Tracker</title>
-  <style>
+PAGE_CSS = r"""
     :root{--radius:22px;--rowH:44px;--wheelH:238px;--wheelW:140px;--wheelW2:95px;--accent:#5b8cff;}
     :root[data-theme="dark"], :root[data-theme="auto"]{
       --bg:#0b0b10;--bg2:rgba(255,255,255,.06);--card1:rgba(255,255,255,.07);--card2:rgba(255,255,255,.03);
@@ -212,105 +689,9 @@ PAGE = r"""
     canvas{display:block}
     .chartCanvas{width:100%;height:230px;border-radius:18px;border:1px solid var(--stroke);background:var(--chartBg)}
     .warn{border:1px solid rgba(255,180,0,.35); background:rgba(255,180,0,.10); padding:10px 12px; border-radius:14px; color:var(--text);}
-  </style>
-</head>
-
-<body>
-  <div class="wrap">
-    <div class="topbar">
-      <div>
-        <h1>Meal Time Tracker</h1>
-        <p>Permanent storage via Postgres (Render). Editing + calories totals + all-time histogram + CSV exports.</p>
-      </div>
-      <div class="row">
-        <button class="iconBtn" id="themeToggle">Theme</button>
-      </div>
-    </div>
-
-    <div id="dbWarn" class="warn" style="display:none;margin-top:10px">
-      Database is temporarily unavailable (or waking up). Try again in a moment.
-    </div>
-
-    <div class="grid">
-      <div class="card">
-        <div class="row" id="mealRow" role="group" aria-label="Meal type">
-          <button class="pill" data-meal="Breakfast" aria-pressed="true">Breakfast</button>
-          <button class="pill" data-meal="Lunch" aria-pressed="false">Lunch</button>
-          <button class="pill" data-meal="Dinner" aria-pressed="false">Dinner</button>
-          <button class="pill" data-meal="Snack" aria-pressed="false">Snack</button>
-        </div>
-
-        <div class="divider"></div>
-
-        <div class="sub">Selected time</div>
-        <div class="timeDisplay" id="timeDisplay">08:00 AM</div>
-
-        <div class="wheelWrap">
-          <div class="wheelOuter">
-            <div class="wheelScroll" id="wheelHour"></div>
-            <div class="selectBand"></div>
-            <div class="fadeTop"></div><div class="fadeBot"></div>
-          </div>
-          <div class="wheelOuter">
-            <div class="wheelScroll" id="wheelMin"></div>
-            <div class="selectBand"></div>
-            <div class="fadeTop"></div><div class="fadeBot"></div>
-          </div>
-          <div class="wheelOuter ampm">
-            <div class="wheelScroll" id="wheelAmPm"></div>
-            <div class="selectBand"></div>
-            <div class="fadeTop"></div><div class="fadeBot"></div>
-          </div>
-        </div>
-
-        <div style="margin-top:12px; display:grid; grid-template-columns: 1fr 160px; gap:10px;">
-          <input id="note" type="text" placeholder="Optional note (e.g., salmon + rice)" />
-          <input id="calories" type="number" inputmode="numeric" min="0" step="1" placeholder="kcal" />
-        </div>
-
-        <div class="row" style="margin-top:14px">
-          <button class="btn" id="saveBtn">Save</button>
-          <button class="btn secondary" id="saveNowBtn">Save Now</button>
-          <button class="btn secondary" id="clearDayBtn">Clear Day</button>
-          <button class="btn secondary" id="exportMealsBtn">Export meals</button>
-          <button class="btn secondary" id="exportHistoBtn">Export histogram</button>
-        </div>
-      </div>
-
-      <div class="card">
-        <div class="row" style="justify-content:space-between;align-items:baseline">
-          <div>
-            <div class="sub">Log (selected day)</div>
-            <div style="font-size:18px;font-weight:900;margin-top:2px" id="logTitle">Today</div>
-          </div>
-          <div class="row">
-            <button class="iconBtn" id="prevDay">←</button>
-            <button class="iconBtn" id="nextDay">→</button>
-          </div>
-        </div>
-
-        <div class="summaryGrid">
-          <div class="kpi"><div class="label">Day total</div><div class="value" id="kpiDay">—</div></div>
-          <div class="kpi"><div class="label">Week total</div><div class="value" id="kpiWeek">—</div></div>
-          <div class="kpi"><div class="label">Month total</div><div class="value" id="kpiMonth">—</div></div>
-          <div class="kpi"><div class="label">All time</div><div class="value" id="kpiAll">—</div></div>
-          <div class="kpi"><div class="label">Avg/day</div><div class="value" id="kpiAvg">—</div></div>
-        </div>
-
-        <div class="divider"></div>
-
-        <div class="sub" id="chartTitle">Meals by hour (24 bars) — All time</div>
-        <canvas id="hourChart" class="chartCanvas"></canvas>
-
-        <div class="divider"></div>
-
-        <div id="log"></div>
-        <div class="sub" id="emptyMsg" style="display:none;margin-top:10px">No entries yet.</div>
-      </div>
-    </div>
-  </div>
+"""
 
-<script>
+PAGE_JS = r"""
   // Theme
   const THEME_KEY="meal_tracker_theme";
   function getTheme(){return localStorage.getItem(THEME_KEY)||"auto";}
@@ -469,11 +850,9 @@ PAGE = r"""
     btn.setAttribute('aria-pressed','true');
   });
 
-  async function renderLog(){
-    const dayIso=isoDate(state.date);
+  function renderLog(list){
     document.getElementById('logTitle').textContent=humanDate(state.date);
-    const data = await jget(`/api/entries?day=${encodeURIComponent(dayIso)}`);
-    const entries=(data.entries||[]).sort((a,b)=>a.ts-b.ts);
+    const entries=(list||[]).sort((a,b)=>a.ts-b.ts);
 
     const log=document.getElementById('log');
     log.innerHTML='';
@@ -511,7 +890,9 @@ PAGE = r"""
       del.className='iconBtn';
       del.textContent='Delete';
       del.onclick=async()=>{
-        await jget(`/api/entries/${entry.id}/delete`);
+        // 404 = already gone (double click, other tab): just refresh
+        const r=await fetch(`/api/entries/${entry.id}/delete`);
+        if(!r.ok && r.status!==404){showDbWarn(true);return;}
         await refreshAll();
       };
 
@@ -522,15 +903,16 @@ PAGE = r"""
     }
   }
 
-  async function renderHistogram(){
-    const hist=await jget('/api/histogram/all');
-    drawHourChart(hist.counts||Array(24).fill(0));
+  // Last histogram from the server; resize/theme redraws reuse it without a fetch
+  let histCounts=Array(24).fill(0);
+  function renderHistogram(hist){
+    const c=hist.counts||{};
+    histCounts=Array.from({length:24},(_,h)=>c[h]||0);
+    drawHourChart(histCounts);
     document.getElementById('chartTitle').textContent=`Meals by hour (24 bars) — All time (${hist.total_entries||0} entries)`;
   }
 
-  async function renderSummary(){
-    const dayIso=isoDate(state.date);
-    const s=await jget(`/api/summary?day=${encodeURIComponent(dayIso)}`);
+  function renderSummary(s){
     document.getElementById('kpiDay').textContent=kcal(s.day_total||0);
     document.getElementById('kpiWeek').textContent=kcal(s.week_total||0);
     document.getElementById('kpiMonth').textContent=kcal(s.month_total||0);
@@ -538,13 +920,19 @@ PAGE = r"""
     document.getElementById('kpiAvg').textContent = `${kcal(s.avg_daily||0)}${s.days_with_entries ? ` (${s.days_with_entries}d)` : ''}`;
   }
 
+  // Only the latest refresh may render; a slower reply for a day already left is dropped
+  let refreshSeq=0;
   async function refreshAll(){
+    const seq=++refreshSeq;
     try{
       showDbWarn(false);
-      await renderLog();
-      await renderSummary();
-      await renderHistogram();
+      const b=await jget(`/api/bootstrap?day=${encodeURIComponent(isoDate(state.date))}&tz=${new Date().getTimezoneOffset()}`);
+      if(seq!==refreshSeq)return;
+      renderLog(b.entries);
+      renderSummary(b.summary||{});
+      renderHistogram(b.histogram||{});
     }catch(e){
+      if(seq!==refreshSeq)return;
       showDbWarn(true);
       console.warn(e);
     }
@@ -614,13 +1002,30 @@ PAGE = r"""
   };
 
   document.getElementById('exportMealsBtn').onclick = () => { window.location.href='/export/meals.csv'; };
-  document.getElementById('exportHistoBtn').onclick = () => { window.location.href='/export/histogram.csv'; };
-
-  document.getElementById('prevDay').onclick=async()=>{state.date=new Date(state.date.getTime()-86400000); await refreshAll();};
-  document.getElementById('nextDay').onclick=async()=>{state.date=new Date(state.date.getTime()+86400000); await refreshAll();};
-
-  window.addEventListener('resize',()=>renderHistogram());
-  const obs=new MutationObserver(()=>renderHistogram());
+  document.getElementById('exportHistoBtn').onclick = () => { window.location.href=`/export/histogram.csv?tz=${new Date().getTimezoneOffset()}`; };
+
+  // Arrow clicks move the date and title at once but fetch only when clicking
+  // pauses, so skipping ahead a week is one request instead of seven. The old
+  // day's rows are cleared right away (and any refresh in flight dropped), so
+  // nothing under the new title belongs to another day.
+  let navTimer=null;
+  function shiftDay(days){
+    state.date=new Date(state.date.getTime()+days*86400000);
+    refreshSeq++;
+    document.getElementById('logTitle').textContent=humanDate(state.date);
+    document.getElementById('log').innerHTML='';
+    document.getElementById('emptyMsg').style.display='none';
+    if(navTimer)clearTimeout(navTimer);
+    navTimer=setTimeout(()=>{navTimer=null;refreshAll();},150);
+  }
+  document.getElementById('prevDay').onclick=()=>shiftDay(-1);
+  document.getElementById('nextDay').onclick=()=>shiftDay(1);
+
+  // Coalesce resize / theme bursts into one redraw
+  let histTimer=null;
+  function scheduleHistogram(){if(histTimer)clearTimeout(histTimer);histTimer=setTimeout(()=>{histTimer=null;drawHourChart(histCounts);},200);}
+  window.addEventListener('resize',scheduleHistogram);
+  const obs=new MutationObserver(scheduleHistogram);
   obs.observe(document.documentElement,{attributes:true,attributeFilter:["data-theme"]});
 
   requestAnimationFrame(async()=>{
@@ -630,26 +1035,235 @@ PAGE = r"""
     updateDisplay();
     await refreshAll();
   });
-</script>
+"""
+
+PAGE_HTML = r"""
+<!doctype html>
+<html lang="en" data-theme="auto">
+<head>
+  <meta charset="utf-8" />
+  <meta name="viewport" content="width=device-width,initial-scale=1" />
+  <title>Meal Time Tracker</title>
+  <link rel="stylesheet" href="__APP_CSS__" />
+</head>
+
+<body>
+  <div class="wrap">
+    <div class="topbar">
+      <div>
+        <h1>Meal Time Tracker</h1>
+        <p>Permanent storage via Postgres (Render). Editing + calories totals + all-time histogram + CSV exports.</p>
+      </div>
+      <div class="row">
+        <button class="iconBtn" id="themeToggle">Theme</button>
+      </div>
+    </div>
+
+    <div id="dbWarn" class="warn" style="display:none;margin-top:10px">
+      Database is temporarily unavailable (or waking up). Try again in a moment.
+    </div>
+
+    <div class="grid">
+      <div class="card">
+        <div class="row" id="mealRow" role="group" aria-label="Meal type">
+          <button class="pill" data-meal="Breakfast" aria-pressed="true">Breakfast</button>
+          <button class="pill" data-meal="Lunch" aria-pressed="false">Lunch</button>
+          <button class="pill" data-meal="Dinner" aria-pressed="false">Dinner</button>
+          <button class="pill" data-meal="Snack" aria-pressed="false">Snack</button>
+        </div>
+
+        <div class="divider"></div>
+
+        <div class="sub">Selected time</div>
+        <div class="timeDisplay" id="timeDisplay">08:00 AM</div>
+
+        <div class="wheelWrap">
+          <div class="wheelOuter">
+            <div class="wheelScroll" id="wheelHour"></div>
+            <div class="selectBand"></div>
+            <div class="fadeTop"></div><div class="fadeBot"></div>
+          </div>
+          <div class="wheelOuter">
+            <div class="wheelScroll" id="wheelMin"></div>
+            <div class="selectBand"></div>
+            <div class="fadeTop"></div><div class="fadeBot"></div>
+          </div>
+          <div class="wheelOuter ampm">
+            <div class="wheelScroll" id="wheelAmPm"></div>
+            <div class="selectBand"></div>
+            <div class="fadeTop"></div><div class="fadeBot"></div>
+          </div>
+        </div>
+
+        <div style="margin-top:12px; display:grid; grid-template-columns: 1fr 160px; gap:10px;">
+          <input id="note" type="text" placeholder="Optional note (e.g., salmon + rice)" />
+          <input id="calories" type="number" inputmode="numeric" min="0" step="1" placeholder="kcal" />
+        </div>
+
+        <div class="row" style="margin-top:14px">
+          <button class="btn" id="saveBtn">Save</button>
+          <button class="btn secondary" id="saveNowBtn">Save Now</button>
+          <button class="btn secondary" id="clearDayBtn">Clear Day</button>
+          <button class="btn secondary" id="exportMealsBtn">Export meals</button>
+          <button class="btn secondary" id="exportHistoBtn">Export histogram</button>
+        </div>
+      </div>
+
+      <div class="card">
+        <div class="row" style="justify-content:space-between;align-items:baseline">
+          <div>
+            <div class="sub">Log (selected day)</div>
+            <div style="font-size:18px;font-weight:900;margin-top:2px" id="logTitle">Today</div>
+          </div>
+          <div class="row">
+            <button class="iconBtn" id="prevDay">←</button>
+            <button class="iconBtn" id="nextDay">→</button>
+          </div>
+        </div>
+
+        <div class="summaryGrid">
+          <div class="kpi"><div class="label">Day total</div><div class="value" id="kpiDay">—</div></div>
+          <div class="kpi"><div class="label">Week total</div><div class="value" id="kpiWeek">—</div></div>
+          <div class="kpi"><div class="label">Month total</div><div class="value" id="kpiMonth">—</div></div>
+          <div class="kpi"><div class="label">All time</div><div class="value" id="kpiAll">—</div></div>
+          <div class="kpi"><div class="label">Avg/day</div><div class="value" id="kpiAvg">—</div></div>
+        </div>
+
+        <div class="divider"></div>
+
+        <div class="sub" id="chartTitle">Meals by hour (24 bars) — All time</div>
+        <canvas id="hourChart" class="chartCanvas"></canvas>
+
+        <div class="divider"></div>
+
+        <div id="log"></div>
+        <div class="sub" id="emptyMsg" style="display:none;margin-top:10px">No entries yet.</div>
+      </div>
+    </div>
+  </div>
+
+<script src="__APP_JS__"></script>
 </body>
 </html>
 """
 
+# CSS and JS are served as separate files under content-hashed names, so the
+# browser caches them for good and a revisit only fetches the small HTML shell.
+# name -> (bytes, gzipped bytes, mimetype)
+ASSETS: dict[str, tuple[bytes, bytes, str]] = {}
+
+
+def static_asset(body: str, ext: str, mimetype: str) -> str:
+    """Register body under a content-hashed name and return its URL."""
+    raw = body.encode("utf-8")
+    name = f"app.{hashlib.blake2b(raw, digest_size=8).hexdigest()}.{ext}"
+    ASSETS[name] = (raw, gzip.compress(raw, 9), mimetype)
+    return f"/assets/{name}"
+
+
+PAGE = PAGE_HTML.replace("__APP_CSS__", static_asset(PAGE_CSS, "css", "text/css")).replace(
+    "__APP_JS__", static_asset(PAGE_JS, "js", "text/javascript")
+)
+
+# PAGE has no template expressions, so encode (and compress) it once at import
+# instead of running it through Jinja on every hit.
+PAGE_BYTES = PAGE.encode("utf-8")
+PAGE_GZ = gzip.compress(PAGE_BYTES, 9)
+# Changes only when the code does; lets a revisit past max-age revalidate to a 304
+PAGE_ETAG = hashlib.blake2b(PAGE_BYTES, digest_size=8).hexdigest()
+
 
 # -------------------- Routes --------------------
 
+def etagged(resp: Response, etag: str) -> Response:
+    """
+    Tag a GET response with etag (built from the data version, see data_version)
+    and turn it into a bodyless 304 when the browser already holds that version.
+    "no-cache" makes the browser revalidate every time, so a fresh save is never
+    hidden behind a cached copy, while unchanged data costs no body or JSON parse.
+    """
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = "private, no-cache"
+    resp.vary.add("Accept-Encoding")
+    return resp.make_conditional(request)
+
+
+def unchanged(etag: str) -> Response | None:
+    """A ready 304 when the browser already holds etag, before the view does any work."""
+    # Weak comparison, as If-None-Match specifies: gzip_json() weakens the tag
+    # of compressed bodies, and those must still match.
+    if request.if_none_match.contains_weak(etag):
+        return etagged(Response(), etag)
+    return None
+
+
+# JSON bodies below this are sent as-is; gzip's framing eats most of the gain
+GZIP_MIN_BYTES = 1024
+
+
+@app.after_request
+def gzip_json(resp: Response) -> Response:
+    """
+    Gzip larger JSON responses (a busy day's entries, bootstrap) when the client
+    accepts it. The page, assets and CSV exports compress themselves already.
+    """
+    if (
+        resp.mimetype != "application/json"
+        or resp.status_code != 200
+        or resp.is_streamed
+        or "Content-Encoding" in resp.headers
+        or not request.accept_encodings["gzip"]
+    ):
+        return resp
+
+    body = resp.get_data()
+    if len(body) < GZIP_MIN_BYTES:
+        return resp
+    resp.set_data(gzip.compress(body, 6))
+    resp.headers["Content-Encoding"] = "gzip"
+    resp.vary.add("Accept-Encoding")
+    # Different bytes than the identity body, so the tag can only be weak
+    etag, _ = resp.get_etag()
+    if etag:
+        resp.set_etag(etag, weak=True)
+    return resp
+
+
+def precompressed(raw: bytes, gz: bytes, mimetype: str, etag: str, cache_control: str) -> Response:
+    """Serve a body compressed at import: gzip when accepted, 304 when unchanged."""
+    headers = {"Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+    if request.accept_encodings["gzip"]:
+        headers["Content-Encoding"] = "gzip"
+        resp = Response(gz, mimetype=mimetype, headers=headers)
+        resp.set_etag(etag + "-gz")  # distinct bytes, distinct tag
+    else:
+        resp = Response(raw, mimetype=mimetype, headers=headers)
+        resp.set_etag(etag)
+    return resp.make_conditional(request)
+
+
 @app.get("/")
 def index():
     # Root should always load fast; DB can fail later without taking the UI down.
-    return render_template_string(PAGE)
+    return precompressed(PAGE_BYTES, PAGE_GZ, "text/html", PAGE_ETAG, "public, max-age=300")
+
+
+@app.get("/assets/<name>")
+def asset(name: str):
+    hit = ASSETS.get(name)
+    if hit is None:
+        return jsonify({"error": "Not found"}), 404
+    raw, gz, mimetype = hit
+    # The name changes with the content, so a cached copy never goes stale
+    etag = name.split(".")[1]
+    return precompressed(raw, gz, mimetype, etag, "public, max-age=31536000, immutable")
 
 
 @app.get("/healthz")
 def healthz():
     try:
         ensure_db_ready()
-        with db() as conn:
-            conn.execute("SELECT 1").fetchone()
+        get_conn().execute("SELECT 1").fetchone()
         return jsonify({"ok": True})
     except Exception as e:
         return jsonify({"ok": False, "error": str(e)}), 503
@@ -659,123 +1273,150 @@ def healthz():
 def get_entries():
     ensure_db_ready()
     day = request.args.get("day") or iso_today()
-    with db() as conn:
-        rows = conn.execute(
-            "SELECT id, day, meal, ts, note, calories FROM entries WHERE day=%s ORDER BY ts ASC",
-            (day,),
-        ).fetchall()
-    return jsonify({"day": day, "entries": rows_to_dicts(rows)})
+    try:
+        d = parse_iso_day(day)
+    except ValueError:
+        return jsonify({"error": "Invalid day. Use YYYY-MM-DD"}), 400
+
+    conn = get_conn()
+    etag = f"e{data_version(conn)}-{day}"
+    if (resp := unchanged(etag)) is not None:
+        return resp
+
+    rows = entries_for_day(conn, d)
+    return etagged(jsonify({"day": day, "entries": rows}), etag)
 
 
 @app.post("/api/entries")
 def add_entry():
     ensure_db_ready()
-    data = request.get_json(force=True, silent=False)
+    try:
+        values = ENTRY_DECODER.decode(request.get_data()).row()
+    except msgspec.DecodeError as e:
+        return jsonify({"error": str(e)}), 400
+    if values is None:
+        return jsonify({"error": "Missing day/meal/ts"}), 400
 
-    day = str(data.get("day") or "").strip()
-    meal = str(data.get("meal") or "").strip()
-    ts = data.get("ts")
-    note = str(data.get("note") or "").strip()
-    calories = data.get("calories", 0)
+    # Triggers keep the histogram, daily totals and data version in step
+    row = get_conn().execute(INSERT_ENTRY_SQL, values, prepare=True).fetchone()
 
-    if not day or not meal or ts is None:
-        return jsonify({"error": "Missing day/meal/ts"}), 400
+    invalidate_caches()
+    return jsonify({"ok": True, "id": int(row["id"])})
 
-    try:
-        ts_int = int(ts)
-    except (TypeError, ValueError):
-        return jsonify({"error": "ts must be int (unix ms)"}), 400
 
-    try:
-        cal_int = int(calories)
-        if cal_int < 0:
-            cal_int = 0
-    except (TypeError, ValueError):
-        cal_int = 0
+# Upper bound on one bulk request, so a single import stays well inside the
+# statement timeout (MAX_BODY_BYTES bounds its size before it is parsed)
+BULK_MAX_ENTRIES = 10_000
 
-    with db() as conn:
-        row = conn.execute(
-            "INSERT INTO entries(day, meal, ts, note, calories) VALUES(%s,%s,%s,%s,%s) RETURNING id",
-            (day, meal, ts_int, note, cal_int),
-        ).fetchone()
 
-    return jsonify({"ok": True, "id": int(row["id"])})
+@app.post("/api/entries/bulk")
+def add_entries_bulk():
+    """
+    Insert a JSON array of entries (same fields as POST /api/entries) in one
+    transaction: one commit for the whole batch, and executemany() pipelines
+    the inserts instead of paying a round-trip each.
+    """
+    ensure_db_ready()
+    if (request.content_length or 0) > MAX_BODY_BYTES:
+        return jsonify({"error": f"Request body too large (max {MAX_BODY_BYTES} bytes)"}), 413
+    try:
+        entries = ENTRIES_DECODER.decode(request.get_data())
+    except msgspec.DecodeError as e:
+        return jsonify({"error": str(e)}), 400
+
+    if len(entries) > BULK_MAX_ENTRIES:
+        return jsonify({"error": f"Too many entries (max {BULK_MAX_ENTRIES} per request)"}), 400
+
+    rows = []
+    for i, entry in enumerate(entries):
+        values = entry.row()
+        if values is None:
+            return jsonify({"error": f"meal is blank - at `$[{i}]`"}), 400
+        rows.append(values)
+
+    ids: list[int] = []
+    if rows:
+        conn = get_conn()
+        with conn.transaction(), conn.cursor() as cur:
+            cur.executemany(INSERT_ENTRY_SQL, rows, returning=True)
+            while True:
+                ids.append(int(cur.fetchone()["id"]))
+                if not cur.nextset():
+                    break
+
+    invalidate_caches()
+    return jsonify({"ok": True, "count": len(ids), "ids": ids})
 
 
 @app.put("/api/entries/<int:entry_id>")
 def update_entry(entry_id: int):
     ensure_db_ready()
-    data = request.get_json(force=True, silent=False)
-
-    day = str(data.get("day") or "").strip()
-    meal = str(data.get("meal") or "").strip()
-    ts = data.get("ts")
-    note = str(data.get("note") or "").strip()
-    calories = data.get("calories", 0)
-
-    if not day or not meal or ts is None:
-        return jsonify({"error": "Missing day/meal/ts"}), 400
-
     try:
-        ts_int = int(ts)
-    except (TypeError, ValueError):
-        return jsonify({"error": "ts must be int (unix ms)"}), 400
-
-    try:
-        cal_int = int(calories)
-        if cal_int < 0:
-            cal_int = 0
-    except (TypeError, ValueError):
-        cal_int = 0
-
-    with db() as conn:
-        row = conn.execute(
-            """
-            UPDATE entries
-            SET day=%s, meal=%s, ts=%s, note=%s, calories=%s
-            WHERE id=%s
-            RETURNING id
-            """,
-            (day, meal, ts_int, note, cal_int, entry_id),
-        ).fetchone()
+        values = ENTRY_DECODER.decode(request.get_data()).row()
+    except msgspec.DecodeError as e:
+        return jsonify({"error": str(e)}), 400
+    if values is None:
+        return jsonify({"error": "Missing day/meal/ts"}), 400
 
+    row = get_conn().execute(
+        """
+        UPDATE entries
+        SET day=%s, meal=%s, ts=%s, note=%s, calories=%s
+        WHERE id=%s
+        RETURNING id
+        """,
+        (*values, entry_id),
+        prepare=True,
+    ).fetchone()
     if not row:
         return jsonify({"error": "Entry not found"}), 404
 
+    invalidate_caches()
     return jsonify({"ok": True, "id": int(row["id"])})
 
 
 @app.get("/api/entries/<int:entry_id>/delete")
 def delete_entry(entry_id: int):
     ensure_db_ready()
-    with db() as conn:
-        conn.execute("DELETE FROM entries WHERE id=%s", (entry_id,))
-    return jsonify({"ok": True})
+    row = get_conn().execute(
+        "DELETE FROM entries WHERE id=%s RETURNING id", (entry_id,), prepare=True
+    ).fetchone()
+    if not row:
+        return jsonify({"error": "Entry not found"}), 404
+
+    invalidate_caches()
+    return jsonify({"ok": True, "id": int(row["id"])})
 
 
 @app.get("/api/entries/clear")
 def clear_day():
     ensure_db_ready()
     day = request.args.get("day") or iso_today()
-    with db() as conn:
-        conn.execute("DELETE FROM entries WHERE day=%s", (day,))
+    try:
+        d = parse_iso_day(day)
+    except ValueError:
+        return jsonify({"error": "Invalid day. Use YYYY-MM-DD"}), 400
+
+    get_conn().execute("DELETE FROM entries WHERE day=%s", (d,), prepare=True)
+    invalidate_caches()
     return jsonify({"ok": True, "day": day})
 
 
 @app.get("/api/histogram/all")
 def histogram_all():
     ensure_db_ready()
-    counts = [0] * 24
-    with db() as conn:
-        rows = conn.execute("SELECT ts FROM entries").fetchall()
+    try:
+        shift = parse_tz_offset(request.args.get("tz"))
+    except ValueError:
+        return jsonify({"error": "Invalid tz. Use minutes, as from Date.getTimezoneOffset()"}), 400
 
-    # Server timezone histogram (simple). If you want true "user local" histogram,
-    # we can store timezone offset per entry.
-    for r in rows:
-        hour = datetime.fromtimestamp(int(r["ts"]) / 1000.0).hour
-        counts[hour] += 1
+    v = data_version(get_conn())
+    etag = f"h{v}{shift:+d}"
+    if (resp := unchanged(etag)) is not None:
+        return resp
 
-    return jsonify({"counts": counts, "total_entries": sum(counts)})
+    _, body = cached_histogram(v, shift)
+    return etagged(Response(body, mimetype="application/json"), etag)
 
 
 @app.get("/api/summary")
@@ -787,82 +1428,162 @@ def summary():
     except Exception:
         return jsonify({"error": "Invalid day. Use YYYY-MM-DD"}), 400
 
-    w0, w1 = week_bounds(d)
-    m0, m1 = month_bounds(d)
+    v = data_version(get_conn())
+    etag = f"s{v}-{d.isoformat()}"
+    if (resp := unchanged(etag)) is not None:
+        return resp
 
-    with db() as conn:
-        day_total = sum_calories_between(conn, d, d)
-        week_total = sum_calories_between(conn, w0, w1)
-        month_total = sum_calories_between(conn, m0, m1)
-
-        all_total = int(
-            conn.execute("SELECT COALESCE(SUM(calories),0) AS total FROM entries")
-            .fetchone()["total"]
-            or 0
-        )
-        days_with_entries = int(
-            conn.execute("SELECT COUNT(DISTINCT day) AS c FROM entries")
-            .fetchone()["c"]
-            or 0
-        )
+    return etagged(jsonify(cached_summary(d, v)), etag)
 
-    avg_daily = round(all_total / days_with_entries) if days_with_entries > 0 else 0
 
-    return jsonify(
-        {
-            "day": day_str,
-            "day_total": day_total,
-            "week_total": week_total,
-            "month_total": month_total,
-            "all_total": all_total,
-            "avg_daily": avg_daily,
-            "days_with_entries": days_with_entries,
-        }
-    )
+@app.get("/api/bootstrap")
+def bootstrap():
+    """
+    Everything the page shows for one day (log, totals, histogram) in a single
+    request, instead of three sequential fetches each borrowing a connection.
+    """
+    ensure_db_ready()
+    day = request.args.get("day") or iso_today()
+    try:
+        d = parse_iso_day(day)
+    except ValueError:
+        return jsonify({"error": "Invalid day. Use YYYY-MM-DD"}), 400
+    try:
+        shift = parse_tz_offset(request.args.get("tz"))
+    except ValueError:
+        return jsonify({"error": "Invalid tz. Use minutes, as from Date.getTimezoneOffset()"}), 400
+
+    # One snapshot for the version check and whatever isn't already cached (the
+    # helpers all run on this request's connection)
+    conn = get_conn()
+    with conn.transaction():
+        conn.execute("SET TRANSACTION ISOLATION LEVEL REPEATABLE READ, READ ONLY")
+        v = data_version(conn)
+        etag = f"b{v}-{day}{shift:+d}"
+        if (resp := unchanged(etag)) is not None:
+            return resp
+        entries = entries_for_day(conn, d)
+        totals = cached_summary(d, v)
+        hist, _ = cached_histogram(v, shift)
+
+    return etagged(jsonify({"day": day, "entries": entries, "summary": totals, "histogram": hist}), etag)
 
 
 # -------------------- CSV exports --------------------
 
+CSV_FLUSH_BYTES = 64 * 1024
+
+# CSV header name -> select expression, in default export order. day is pinned
+# to ISO like the JSON views, instead of following the server's DateStyle.
+MEALS_CSV_COLUMNS = {
+    "id": sql.Identifier("id"),
+    "day": sql.SQL("to_char(day, 'YYYY-MM-DD')"),
+    "meal": sql.Identifier("meal"),
+    "ts_ms": sql.Identifier("ts"),
+    "calories": sql.Identifier("calories"),
+    "note": sql.Identifier("note"),
+}
+
+
+def gzip_stream(chunks: Iterable[bytes]) -> Iterator[bytes]:
+    """
+    Gzip a byte stream on the fly. CSV shrinks several-fold (repeated days, small
+    numbers); level 3 keeps nearly all of that for a fraction of level 9's CPU.
+    """
+    z = zlib.compressobj(3, zlib.DEFLATED, 31)  # wbits 16+15: gzip framing
+    for chunk in chunks:
+        out = z.compress(chunk)
+        if out:
+            yield out
+    yield z.flush()
+
+
+def copy_csv(query: sql.Composable) -> Iterator[bytes]:
+    """
+    CSV straight from Postgres (COPY ... TO STDOUT): formatted in C and streamed
+    row by row. The connection is borrowed here, not via get_conn(), because
+    this runs while the response streams.
+    """
+    with db() as conn, conn.cursor() as cur, cur.copy(query) as copy:
+        yield from copy
+
+
+def csv_rows(header: list[str], rows: Iterable[Iterable[Any]]) -> Iterator[bytes]:
+    """CSV for rows already in Python, one line at a time, in COPY's dialect."""
+    out = io.StringIO()
+    w = csv.writer(out, lineterminator="\n")
+    for row in itertools.chain([header], rows):
+        w.writerow(row)
+        yield out.getvalue().encode("utf-8")
+        out.seek(0)
+        out.truncate(0)
+
+
+def csv_response(chunks: Iterable[bytes], filename: str) -> Response:
+    """
+    Stream CSV chunks as a download: batched into ~64 KB writes (one reused
+    buffer, so memory stays flat) and gzipped when the client accepts it.
+    """
+
+    def batched() -> Iterator[bytes]:
+        buf = bytearray()
+        for chunk in chunks:
+            buf += chunk
+            if len(buf) >= CSV_FLUSH_BYTES:
+                yield bytes(buf)
+                buf.clear()
+        if buf:
+            yield bytes(buf)
+
+    body = batched()
+    headers = {"Content-Disposition": f'attachment; filename="{filename}"', "Vary": "Accept-Encoding"}
+    if request.accept_encodings["gzip"]:
+        body = gzip_stream(body)
+        headers["Content-Encoding"] = "gzip"
+    return Response(stream_with_context(body), mimetype="text/csv", headers=headers)
+
+
 @app.get("/export/meals.csv")
 def export_meals_csv():
     ensure_db_ready()
-    with db() as conn:
-        rows = conn.execute(
-            "SELECT id, day, meal, ts, note, calories FROM entries ORDER BY day ASC, ts ASC"
-        ).fetchall()
 
-    out = io.StringIO()
-    w = csv.writer(out)
-    w.writerow(["id", "day", "meal", "ts_ms", "calories", "note"])
-    for r in rows:
-        w.writerow([r["id"], r["day"], r["meal"], int(r["ts"]), int(r["calories"] or 0), r["note"] or ""])
-
-    return Response(
-        out.getvalue(),
-        mimetype="text/csv",
-        headers={"Content-Disposition": 'attachment; filename="meals.csv"'},
+    # ?fields=id,day,calories exports just those columns, so a big export can
+    # leave out the (possibly long) notes instead of shipping them
+    fields = [f.strip() for f in (request.args.get("fields") or "").split(",") if f.strip()]
+    fields = fields or list(MEALS_CSV_COLUMNS)
+    unknown = [f for f in fields if f not in MEALS_CSV_COLUMNS]
+    if unknown:
+        return jsonify({"error": f"Unknown field(s): {', '.join(unknown)}"}), 400
+
+    query = sql.SQL(
+        """
+        COPY (
+          SELECT {} FROM entries ORDER BY day ASC, ts ASC
+        ) TO STDOUT WITH (FORMAT csv, HEADER)
+        """
+    ).format(
+        sql.SQL(", ").join(
+            sql.SQL("{} AS {}").format(MEALS_CSV_COLUMNS[f], sql.Identifier(f))
+            for f in fields
+        )
     )
+    return csv_response(copy_csv(query), "meals.csv")
 
 
 @app.get("/export/histogram.csv")
 def export_histogram_csv():
     ensure_db_ready()
-    counts = [0] * 24
-    with db() as conn:
-        rows = conn.execute("SELECT ts FROM entries").fetchall()
+    try:
+        shift = parse_tz_offset(request.args.get("tz"))
+    except ValueError:
+        return jsonify({"error": "Invalid tz. Use minutes, as from Date.getTimezoneOffset()"}), 400
 
-    for r in rows:
-        hour = datetime.fromtimestamp(int(r["ts"]) / 1000.0).hour
-        counts[hour] += 1
+    counts = hour_counts(get_conn(), shift)
+    return csv_response(csv_rows(["hour", "count"], enumerate(counts)), "histogram.csv")
 
-    out = io.StringIO()
-    w = csv.writer(out)
-    w.writerow(["hour", "count"])
-    for h in range(24):
-        w.writerow([h, counts[h]])
-
-    return Response(
-        out.getvalue(),
-        mimetype="text/csv",
-        headers={"Content-Disposition": 'attachment; filename="histogram.csv"'},
-    )
+
+if __name__ == "__main__":
+    # Local runs only; production goes through gunicorn (see Procfile), whose
+    # long-lived gthread workers keep the pool and prepared statements warm.
+    init_db()
+    app.run(host="0.0.0.0", port=int(os.environ.get("PORT", "5000")), threaded=True)